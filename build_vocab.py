@@ -5,6 +5,10 @@ Build species-level vocabularies for faunistics quiz from iNaturalist.
 Usage:
   python build_vocab.py --mode basic
   python build_vocab.py --mode extended
+  python build_vocab.py --mode basic --no-cache   # ignore cached iNat responses
+
+If requests-cache is installed (pip install requests-cache), iNat responses are
+cached on disk (1 day, taxonomy 7 days), so reruns are much faster.
 
 This will write JSON files to:
   data/basic/*_vocab_sweden.json
@@ -22,12 +26,37 @@ Each entry includes:
 """
 
 import argparse
+import heapq
 import json
 import os
+import random
+import re
+import sys
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional
 
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib json module
+    orjson = None
+
+try:
+    import requests_cache
+except ImportError:  # optional: without it every run hits the iNat API
+    requests_cache = None
+
+# Retry(backoff_jitter=..., backoff_max=...) needs urllib3 2.x; requests still
+# accepts 1.26, where retries back off without jitter.
+URLLIB3_V2 = int(urllib3.__version__.split(".")[0]) >= 2
 
 # -------------------------------------------------------------------
 # Config
@@ -38,18 +67,61 @@ INAT_BASE = "https://api.inaturalist.org/v1"
 # iNaturalist place_id for Sweden (confirmed from /places/autocomplete)
 SWEDEN_PLACE_ID = 7599
 
+# Root of the iNat tree ("Life"). It heads every ancestor_ids list, but
+# /v1/taxa leaves it out of `ancestors`.
+LIFE_TAXON_ID = 48460
+
 # Default number of TOP items per group (only used if top_n not given)
 DEFAULT_TOP_N = 100
 
+# Page size for /observations/species_counts; this endpoint allows up to 500
+# (most other iNat endpoints stop at 200).
+SPECIES_COUNTS_PER_PAGE = 500
+
 # Maximum number of pages to fetch per taxon when calling /observations/species_counts
-# Each page contains up to 200 species.
-MAX_SPECIES_PAGES = 3  # adjust as needed
-MAX_RETRIES_PER_REQUEST = 5  # how many times to retry a single page on 429
-INITIAL_BACKOFF_SECONDS = 1.0  # starting wait after first 429
+# Each page contains up to SPECIES_COUNTS_PER_PAGE species.
+MAX_SPECIES_PAGES = 2  # adjust as needed
+MAX_RETRIES_PER_REQUEST = 5  # how many times to retry a request on 429 / 5xx
+INITIAL_BACKOFF_SECONDS = 1.0  # backoff factor when there is no Retry-After
+MAX_BACKOFF_SECONDS = 60.0  # cap for a single exponential backoff sleep
+BACKOFF_JITTER_SECONDS = 1.0  # random extra added to each backoff sleep
+
+# How many iNat requests may be in flight at once (pages / taxa fetched in parallel).
+# Kept low on purpose: iNat asks API clients to stay around 1 request/second.
+MAX_CONCURRENT_REQUESTS = 8
+
+# Client-side rate limit for requests that actually go out to iNat
+# (cache hits are free). iNat asks for ~1 request/second; a small burst is fine.
+RATE_LIMIT_PER_SECOND = 1.0
+RATE_LIMIT_BURST = 2
+
+# Keep-alive connections kept per host. Worker pools can nest (taxa x pages),
+# so this is sized above MAX_CONCURRENT_REQUESTS. Workers beyond it wait for a
+# pooled connection instead of opening (and then discarding) a fresh one.
+HTTP_POOL_MAXSIZE = 32
+
+REQUEST_TIMEOUT_SECONDS = 45.0
+USER_AGENT = "floristik-faunistik-quiz-vocab/1.0"
+
+# On-disk HTTP cache (SQLite, only used if requests-cache is installed).
+# Observation counts and example photos move daily; taxonomy much more slowly.
+# Cache-Control headers sent by iNat take precedence. Use --no-cache to force
+# fresh data.
+HTTP_CACHE_NAME = ".inat_http_cache"
+HTTP_CACHE_EXPIRE_AFTER = timedelta(days=1)
+HTTP_CACHE_URLS_EXPIRE_AFTER = {
+    "*/v1/taxa/*": timedelta(days=7),
+}
 
 # Where to write the JSON files (base folder)
 BASE_OUTPUT_DIR = "data"
 
+# Persistent taxonomy cache (taxonId -> trimmed /v1/taxa record), reused across
+# runs since taxonomy rarely changes. Bump the version when the stored record
+# shape changes; older cache files are then ignored. --no-cache clears it.
+TAXON_CACHE_PATH = os.path.join(BASE_OUTPUT_DIR, "_taxon_cache.json")
+TAXON_CACHE_VERSION = 1
+
 # Licenses we consider "safe" for student-facing usage
 CONFIG_ALLOWED_LICENSES = ["cc0", "cc-by", "cc-by-nc"]
 
@@ -200,133 +272,539 @@ def get_taxa_config(mode: str):
 # -------------------------------------------------------------------
 
 def ensure_output_dir(path: str) -> None:
-    if not os.path.isdir(path):
-        os.makedirs(path, exist_ok=True)
+    os.makedirs(path, exist_ok=True)
 
 
-def write_json(obj: Any, path: str) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
+def log(message: str) -> None:
+    """
+    print() for code that runs in worker threads: the message and its newline
+    go out in one write, so lines from parallel requests never run together.
+    """
+    sys.stdout.write(message + "\n")
+
+
+def json_loads(data: bytes) -> Any:
+    """Decode a JSON body, with orjson if it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@lru_cache(maxsize=None)
+def genus_of(scientific_name: str) -> str:
+    """First token of a scientific name ("Bombus terrestris" -> "Bombus")."""
+    return scientific_name.partition(" ")[0]
+
+
+def write_json(obj: Any, path: str, indent: bool = True) -> None:
+    """
+    Write obj as UTF-8 JSON, indented (vocab files, diffable in git) or
+    compact (internal caches). Goes through a temp file + os.replace,
+    so an interrupted run never leaves a half-written vocab behind.
+
+    The document is serialized in full first and written in a single call.
+    """
+    if orjson is not None:
+        buf = orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    elif indent:
+        buf = json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    else:
+        buf = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:  # buffered write() always writes all of buf
+        f.write(buf)
+    os.replace(tmp_path, path)
 
 
 # -------------------------------------------------------------------
 # iNat API calls
 # -------------------------------------------------------------------
 
+class TokenBucket:
+    """
+    Thread-safe token bucket: acquire() blocks until a token is available.
+    Tokens refill at `rate` per second, up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def drain(self, pause_seconds: float = 0.0) -> None:
+        """
+        Drop all tokens, e.g. after the server answered 429. With
+        pause_seconds, no token is handed out for that long either.
+        """
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, -pause_seconds * self.rate)
+
+
+RATE_LIMITER = TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+
+
+def header_seconds(headers: Mapping[str, str], name: str) -> Optional[float]:
+    """
+    Parse a numeric response header (Retry-After, X-RateLimit-*) as seconds.
+    Returns None if the header is missing or not a plain number.
+    """
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def rate_limit_reset_seconds(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    If the server says the rate-limit window is used up
+    (X-RateLimit-Remaining: 0), return how long until X-RateLimit-Reset.
+    The reset may be sent as seconds-from-now or as a Unix timestamp.
+    """
+    if header_seconds(headers, "X-RateLimit-Remaining") != 0:
+        return None
+    reset = header_seconds(headers, "X-RateLimit-Reset")
+    if reset is None:
+        return None
+    if reset > 1e9:  # Unix timestamp
+        reset = max(0.0, reset - time.time())
+    return reset
+
+
+class RateLimitedRetry(Retry):
+    """
+    urllib3 Retry that also pauses RATE_LIMITER when iNat answers 429, so
+    the other worker threads back off too, not just the one being retried.
+
+    urllib3 resends retries itself, without going back through the adapter,
+    so sleep() takes the RATE_LIMITER token for them.
+
+    Without a Retry-After header the exponential backoff (from
+    INITIAL_BACKOFF_SECONDS up to MAX_BACKOFF_SECONDS) gets up to
+    BACKOFF_JITTER_SECONDS added (urllib3 2.x only), so parallel workers
+    that were throttled together do not all retry at the same instant.
+    Retry-After, when sent, is used as-is.
+    """
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        if backoff == 0:
+            # urllib3 does not wait (or jitter) before the first retry at all.
+            jitter = getattr(self, "backoff_jitter", 0.0)
+            backoff = INITIAL_BACKOFF_SECONDS + random.random() * jitter
+        return min(MAX_BACKOFF_SECONDS, backoff)
+
+    def sleep(self, response=None) -> None:
+        super().sleep(response)
+        RATE_LIMITER.acquire()
+
+    def increment(self, method=None, url=None, response=None, *args, **kwargs):
+        if response is not None and response.status == 429:
+            wait = header_seconds(response.headers, "Retry-After")
+            log(f"    Got 429 (throttling) for {url}, retrying...")
+            RATE_LIMITER.drain(wait or 0.0)
+        return super().increment(method, url, response, *args, **kwargs)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that takes a RATE_LIMITER token before every request sent
+    over the network (retries take theirs in RateLimitedRetry.sleep()).
+    Requests answered from the on-disk cache never reach the adapter, so
+    they are not throttled.
+
+    The bucket is also paused when iNat reports the current rate-limit
+    window as used up; 429s are handled by RateLimitedRetry.
+    """
+
+    def send(self, request, **kwargs):
+        RATE_LIMITER.acquire()
+        resp = super().send(request, **kwargs)
+        reset = rate_limit_reset_seconds(resp.headers)
+        if reset:
+            log(f"    Rate-limit window used up, pausing requests for {reset:.1f}s...")
+            RATE_LIMITER.drain(reset)
+        return resp
+
+
+def make_session() -> requests.Session:
+    """
+    Create the HTTP session used for all iNat calls: a requests_cache
+    CachedSession when available, otherwise a plain requests.Session.
+
+    Retries (429 + transient 5xx, honoring Retry-After, with exponential
+    backoff otherwise) are done by urllib3 inside the mounted adapter.
+    """
+    if requests_cache is not None:
+        session = requests_cache.CachedSession(
+            HTTP_CACHE_NAME,
+            backend="sqlite",
+            expire_after=HTTP_CACHE_EXPIRE_AFTER,
+            urls_expire_after=HTTP_CACHE_URLS_EXPIRE_AFTER,
+            allowable_methods=("GET",),
+            cache_control=True,
+        )
+    else:
+        session = requests.Session()
+    backoff_kwargs: Dict[str, Any] = {}
+    if URLLIB3_V2:
+        backoff_kwargs = {
+            "backoff_max": MAX_BACKOFF_SECONDS,
+            "backoff_jitter": BACKOFF_JITTER_SECONDS,
+        }
+    retry = RateLimitedRetry(
+        total=MAX_RETRIES_PER_REQUEST,
+        backoff_factor=INITIAL_BACKOFF_SECONDS,
+        **backoff_kwargs,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+        raise_on_status=False,  # hand back the last response; raise_for_status() reports it
+    )
+    adapter = RateLimitedAdapter(
+        pool_connections=1,  # every call goes to the one iNat API host
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        pool_block=True,
+        max_retries=retry,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+# One shared session for the whole run, so keep-alive connections to
+# api.inaturalist.org are reused instead of paying a new TCP + TLS handshake
+# per request. The underlying urllib3 pool is shared by the worker threads.
+# Created on first use, so merely importing this module (as build_course_vocab
+# does) never creates the on-disk cache.
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the shared session, creating it with make_session() on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = make_session()
+        return _session
+
+
+def get_json_with_retries(url: str, params: Dict[str, Any], what: str) -> Dict[str, Any]:
+    """
+    GET an iNat endpoint and return the decoded JSON body.
+
+    Retries on 429 / 5xx happen in the session's adapter (see make_session);
+    `what` is only used in log messages.
+    """
+    resp = get_session().get(url, params=params, timeout=REQUEST_TIMEOUT_SECONDS)
+    if not resp.ok:
+        log(f"    Request for {what} failed with HTTP {resp.status_code}")
+    resp.raise_for_status()
+    return json_loads(resp.content)
+
+
+# species_counts pages already fetched in this run, keyed by the full query.
+_species_counts_pages: Dict[tuple, Dict[str, Any]] = {}
+
+
+def fetch_species_counts_page(
+    filters: Dict[str, Any],
+    page: int,
+    per_page: int = SPECIES_COUNTS_PER_PAGE,
+    locale: str = "sv",
+) -> Dict[str, Any]:
+    """
+    Fetch a single page of /observations/species_counts. `filters` selects
+    what is counted (taxon_id + place_id, or project_id). Returns the raw
+    response body (results + total_results).
+
+    Pages are memoized for the run, so groups that share a query never
+    fetch the same page twice.
+    """
+    params = {
+        **filters,
+        "per_page": per_page,
+        "page": page,
+        "verifiable": "true",
+        "locale": locale,
+        "order_by": "observations_count",
+        "order": "desc",
+    }
+    key = tuple(sorted(params.items()))
+    cached = _species_counts_pages.get(key)
+    if cached is not None:
+        return cached
+
+    desc = ", ".join(f"{k}={v}" for k, v in filters.items())
+    log(f"  Requesting species_counts for {desc}, page={page}, per_page={per_page}...")
+
+    data = get_json_with_retries(
+        f"{INAT_BASE}/observations/species_counts",
+        params,
+        what=f"{desc}, page={page}",
+    )
+    _species_counts_pages[key] = data
+    return data
+
+
+def fetch_species_counts_paged(
+    filters: Dict[str, Any],
+    per_page: int = SPECIES_COUNTS_PER_PAGE,
+    locale: str = "sv",
+    max_pages: int = MAX_SPECIES_PAGES,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch all species_counts results for `filters`, up to max_pages pages.
+
+    Results come most observed first, so when the caller only needs the top
+    `limit` species, only the pages holding those are fetched - all at once,
+    without waiting for page 1 to tell how many there are.
+
+    Without a limit, page 1 is fetched first to learn total_results; the
+    remaining pages are then fetched in parallel. Either way the results are
+    concatenated in page order.
+    """
+    def fetch_pages(pages: range) -> List[Dict[str, Any]]:
+        if len(pages) == 1:
+            return [fetch_species_counts_page(filters, pages[0], per_page, locale)]
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as ex:
+            return list(ex.map(
+                lambda p: fetch_species_counts_page(filters, p, per_page, locale),
+                pages,
+            ))
+
+    results: List[Dict[str, Any]] = []
+
+    if limit is not None:
+        for data in fetch_pages(range(1, min(max_pages, -(-limit // per_page)) + 1)):
+            page_results = data.get("results", [])
+            results.extend(page_results)
+            if len(page_results) < per_page:
+                break  # ran out of species before the limit
+        return results
+
+    first = fetch_species_counts_page(filters, 1, per_page, locale)
+    results.extend(first.get("results", []))
+    if not results:
+        return results
+
+    total = first.get("total_results", 0)
+    last_page = -(-total // per_page)  # ceil
+    if last_page > max_pages:
+        log(f"  Reached max_pages={max_pages}, stopping early.")
+        last_page = max_pages
+
+    pages = range(2, last_page + 1)
+    if pages:
+        for data in fetch_pages(pages):
+            results.extend(data.get("results", []))
+
+    return results
+
+
 def fetch_species_counts(
     taxon_id: int,
     place_id: int,
-    per_page: int = 200,
+    per_page: int = SPECIES_COUNTS_PER_PAGE,
     locale: str = "sv",
+    limit: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
     """
     Fetch leaf-taxon counts (typically species) for a given higher taxon in a place
-    using /observations/species_counts.
-
-    Respects MAX_SPECIES_PAGES and retries on 429 (normal_throttling).
+    using /observations/species_counts (at most MAX_SPECIES_PAGES pages, and no
+    more pages than needed for `limit` species).
     """
-    results: List[Dict[str, Any]] = []
-    page = 1
+    return fetch_species_counts_paged(
+        {"taxon_id": taxon_id, "place_id": place_id},
+        per_page=per_page,
+        locale=locale,
+        limit=limit,
+    )
 
-    while True:
-        if page > MAX_SPECIES_PAGES:
-            print(f"  Reached MAX_SPECIES_PAGES={MAX_SPECIES_PAGES}, stopping early.")
-            break
 
-        params = {
-            "place_id": place_id,
-            "taxon_id": taxon_id,
-            "per_page": per_page,
-            "page": page,
-            "verifiable": "true",
-            "locale": locale,
-            "order_by": "observations_count",
-            "order": "desc",
-        }
+# Taxa already known from earlier runs or groups, keyed by
+# "<preferred_place_id>:<taxonId>" (common names depend on the preferred place).
+TAXON_CACHE: Dict[str, Dict[str, Any]] = {}
 
-        print(
-            f"  Requesting species_counts for taxon_id={taxon_id}, "
-            f"place_id={place_id}, page={page}, per_page={per_page}..."
-        )
+_TAXON_FIELDS = ("id", "name", "rank", "preferred_common_name", "ancestor_ids")
+_ANCESTOR_FIELDS = ("id", "name", "rank", "preferred_common_name")
 
-        attempt = 0
-        while True:
-            resp = requests.get(f"{INAT_BASE}/observations/species_counts", params=params)
-
-            if resp.status_code == 429:
-                attempt += 1
-                if attempt > MAX_RETRIES_PER_REQUEST:
-                    raise requests.HTTPError(
-                        f"Exceeded max retries ({MAX_RETRIES_PER_REQUEST}) after 429 "
-                        f"for taxon_id={taxon_id}, page={page}"
-                    )
-                wait = INITIAL_BACKOFF_SECONDS * (2 ** (attempt - 1))
-                print(f"    Got 429 (throttling). Sleeping {wait:.1f}s before retry...")
-                time.sleep(wait)
-                continue
-
-            resp.raise_for_status()
-            break
 
-        data = resp.json()
-        page_results = data.get("results", [])
-        if not page_results:
-            break
+def trim_taxon(taxon: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the taxon (and ancestor) fields the vocab builders use."""
+    trimmed = {k: taxon[k] for k in _TAXON_FIELDS if k in taxon}
+    trimmed["ancestors"] = [
+        {k: anc.get(k) for k in _ANCESTOR_FIELDS} for anc in taxon.get("ancestors") or []
+    ]
+    return trimmed
 
-        results.extend(page_results)
 
-        total = data.get("total_results", 0)
-        if page * per_page >= total:
-            break
+def load_taxon_cache(path: str = TAXON_CACHE_PATH) -> None:
+    """Fill TAXON_CACHE from disk; a missing, broken or outdated file is ignored."""
+    try:
+        with open(path, "rb") as f:
+            data = json_loads(f.read())
+    except (OSError, ValueError):
+        return
+    if not isinstance(data, dict) or data.get("version") != TAXON_CACHE_VERSION:
+        print(f"  Ignoring outdated taxonomy cache '{path}'")
+        return
+    TAXON_CACHE.update(data.get("taxa") or {})
+    print(f"  Loaded {len(TAXON_CACHE)} cached taxa from '{path}'")
 
-        page += 1
-        time.sleep(0.2)  # be gentle between pages
 
-    return results
+def save_taxon_cache(path: str = TAXON_CACHE_PATH) -> None:
+    ensure_output_dir(os.path.dirname(path) or ".")
+    # Compact: the cache is never read by people and grows with every group.
+    write_json({"version": TAXON_CACHE_VERSION, "taxa": TAXON_CACHE}, path, indent=False)
 
 
-def fetch_taxon_details(taxon_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+def fetch_taxon_details(
+    taxon_ids: List[int],
+    preferred_place_id: Optional[int] = SWEDEN_PLACE_ID,
+) -> Dict[int, Dict[str, Any]]:
     """
     Fetch full taxon info (including ancestors with class, order, family) for a
     list of taxon IDs.
 
-    Uses /v1/taxa/<ids> and returns a dict taxonId -> taxon object.
+    Uses /v1/taxa/<ids> and returns a dict taxonId -> taxon object (trimmed
+    to the fields we use). Taxa already in TAXON_CACHE are not re-fetched.
 
     Batches in chunks to avoid URL length issues.
     """
     result: Dict[int, Dict[str, Any]] = {}
+    missing: List[int] = []
+    for tid in taxon_ids:
+        cached = TAXON_CACHE.get(f"{preferred_place_id}:{tid}")
+        if cached is not None:
+            result[tid] = cached
+        else:
+            missing.append(tid)
+
+    if result:
+        print(f"  {len(result)} taxa from taxonomy cache, {len(missing)} to fetch")
+    taxon_ids = missing
     if not taxon_ids:
         return result
 
     chunk_size = 30
+    chunks = [taxon_ids[i:i + chunk_size] for i in range(0, len(taxon_ids), chunk_size)]
+
+    # Swedish locale + preferred_place_id to get Swedish common names where available
+    params: Dict[str, Any] = {"locale": "sv"}
+    if preferred_place_id is not None:
+        params["preferred_place_id"] = preferred_place_id
 
-    for i in range(0, len(taxon_ids), chunk_size):
-        chunk = taxon_ids[i:i + chunk_size]
+    def fetch_chunk(chunk: List[int]) -> Dict[str, Any]:
         url = f"{INAT_BASE}/taxa/{','.join(str(t) for t in chunk)}"
-        # Swedish locale + preferred_place_id to get Swedish common names where available
-        params = {
-            "locale": "sv",
-            "preferred_place_id": SWEDEN_PLACE_ID,
-        }
+        log(f"  Enriching taxonomy for taxon_ids {chunk[0]}..{chunk[-1]}")
+        return get_json_with_retries(url, params, what=f"taxa {chunk[0]}..{chunk[-1]}")
 
-        print(f"  Enriching taxonomy for taxon_ids {chunk[0]}..{chunk[-1]}")
+    # Chunks are independent requests; RATE_LIMITER keeps the parallelism polite.
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as ex:
+        for data in ex.map(fetch_chunk, chunks):
+            for t in data.get("results", []):
+                trimmed = trim_taxon(t)
+                result[t["id"]] = trimmed
+                TAXON_CACHE[f"{preferred_place_id}:{t['id']}"] = trimmed
 
-        resp = requests.get(url, params=params)
-        resp.raise_for_status()
-        data = resp.json()
+    return result
 
-        for t in data.get("results", []):
-            result[t["id"]] = t
 
-        time.sleep(0.2)
+def taxa_from_known_ancestors(
+    taxa: List[Dict[str, Any]],
+    preferred_place_id: Optional[int] = SWEDEN_PLACE_ID,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Rebuild the lineage of species_counts taxa locally from their ancestor_ids,
+    for taxa whose every ancestor is already known from TAXON_CACHE (e.g. a new
+    species in a genus seen before). Those need no /v1/taxa request at all.
+    The root (LIFE_TAXON_ID) is not required, as cached ancestors never list it.
 
+    Returns taxonId -> trimmed taxon with ancestors, and caches the results.
+    """
+    prefix = f"{preferred_place_id}:"
+    known: Dict[int, Dict[str, Any]] = {}
+    for key, cached in TAXON_CACHE.items():
+        if key.startswith(prefix):
+            for anc in cached.get("ancestors") or []:
+                known[anc["id"]] = anc
+
+    result: Dict[int, Dict[str, Any]] = {}
+    if not known:
+        return result
+    for taxon in taxa:
+        tid = taxon["id"]
+        lineage = [
+            a for a in taxon.get("ancestor_ids") or [] if a not in (tid, LIFE_TAXON_ID)
+        ]
+        if lineage and all(a in known for a in lineage):
+            rebuilt = trim_taxon({**taxon, "ancestors": [known[a] for a in lineage]})
+            result[tid] = rebuilt
+            TAXON_CACHE[f"{preferred_place_id}:{tid}"] = rebuilt
     return result
 
 
+def resolve_taxonomy(
+    taxa: List[Dict[str, Any]],
+    preferred_place_id: Optional[int] = SWEDEN_PLACE_ID,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Get the full lineage for species_counts taxa with as few /v1/taxa calls as
+    possible: taxa that already carry usable ancestors (not seen from the v1
+    API today) are skipped, cached or locally rebuildable ones are served
+    without HTTP, and only the rest is fetched via fetch_taxon_details.
+
+    Returns taxonId -> taxon with ancestors (for the taxa that needed it).
+    """
+    needed: Dict[int, Dict[str, Any]] = {}
+    for taxon in taxa:
+        tid = taxon.get("id")
+        if tid is not None and needs_taxonomy(taxon):
+            needed.setdefault(tid, taxon)
+
+    uncached = [
+        taxon for tid, taxon in needed.items()
+        if f"{preferred_place_id}:{tid}" not in TAXON_CACHE
+    ]
+    rebuilt = taxa_from_known_ancestors(uncached, preferred_place_id)
+    if rebuilt:
+        print(f"  Rebuilt lineage for {len(rebuilt)} taxa from known ancestors")
+
+    # Cached and rebuilt taxa are now in TAXON_CACHE and served without HTTP.
+    return fetch_taxon_details(sorted(needed), preferred_place_id)
+
+
+@lru_cache(maxsize=None)
 def fetch_example_observation_for_species(taxon_id: int) -> Optional[Dict[str, Any]]:
     """
     Fetch a single example observation with a usable photo for a species (taxon_id).
-    Prefer Sweden, fall back to worldwide.
+    Prefer Sweden, fall back to worldwide. Memoized, so a species shared by
+    several groups is looked up once per run.
 
     Returns a dict with:
       {
@@ -343,7 +821,7 @@ def fetch_example_observation_for_species(taxon_id: int) -> Optional[Dict[str, A
         params: Dict[str, Any] = {
             "taxon_id": taxon_id,
             "photos": "true",
-            "per_page": 30,
+            "per_page": 1,  # only the newest observation is used
             "order": "desc",
             "order_by": "created_at",
             "locale": "sv",
@@ -352,14 +830,9 @@ def fetch_example_observation_for_species(taxon_id: int) -> Optional[Dict[str, A
         if place_id is not None:
             params["place_id"] = place_id
 
-        resp = requests.get(f"{INAT_BASE}/observations", params=params)
-        if resp.status_code == 429:
-            print(f"    429 throttling for taxon_id={taxon_id}, sleeping 2s...")
-            time.sleep(2.0)
-            resp = requests.get(f"{INAT_BASE}/observations", params=params)
-
-        resp.raise_for_status()
-        data = resp.json()
+        data = get_json_with_retries(
+            f"{INAT_BASE}/observations", params, what=f"observations for taxon_id={taxon_id}"
+        )
         return data.get("results", [])
 
     # Try Sweden, then global
@@ -369,7 +842,71 @@ def fetch_example_observation_for_species(taxon_id: int) -> Optional[Dict[str, A
     if not results:
         return None
 
-    raw = results[0]  # could randomize if you like
+    return example_from_observation(results[0])  # could randomize if you like
+
+
+def fetch_example_observations_bulk(
+    taxon_ids: List[int],
+    filters: Dict[str, Any],
+    chunk_size: int = 40,
+) -> Dict[int, Optional[Dict[str, Any]]]:
+    """
+    Look up example observations for many species with one /observations
+    call per chunk of taxon IDs (taxon_id=<id>,<id>,...), newest first.
+
+    The first observation seen for a requested taxon (or a descendant, e.g.
+    a subspecies) is the same one a per-species query would return first,
+    so it is turned into that species' example via example_from_observation.
+
+    Returns taxonId -> example (or None if its newest observation has no usable
+    photo). Species that did not show up within a chunk's single page of
+    results are left out; callers fall back to a per-species lookup for those.
+    """
+    chunks = [taxon_ids[i:i + chunk_size] for i in range(0, len(taxon_ids), chunk_size)]
+
+    def fetch_chunk(chunk: List[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        params: Dict[str, Any] = {
+            **filters,
+            "taxon_id": ",".join(str(t) for t in chunk),
+            "photos": "true",
+            "per_page": 200,
+            "order": "desc",
+            "order_by": "created_at",
+            "locale": "sv",
+            "quality_grade": "research",
+        }
+        log(f"  Fetching example observations for taxon_ids {chunk[0]}..{chunk[-1]}")
+        data = get_json_with_retries(
+            f"{INAT_BASE}/observations", params, what=f"observations {chunk[0]}..{chunk[-1]}"
+        )
+
+        wanted = set(chunk)
+        found: Dict[int, Optional[Dict[str, Any]]] = {}
+        for raw in data.get("results", []):
+            taxon = raw.get("taxon") or {}
+            lineage = taxon.get("ancestor_ids") or [taxon.get("id")]
+            for tid in lineage:
+                if tid in wanted and tid not in found:
+                    found[tid] = example_from_observation(raw)
+        return found
+
+    result: Dict[int, Optional[Dict[str, Any]]] = {}
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as ex:
+        for found in ex.map(fetch_chunk, chunks):
+            result.update(found)
+    return result
+
+
+# Size variant in an iNat photo URL, e.g. ".../photos/123/square.jpg".
+_PHOTO_SIZE_RE = re.compile(r"/(?:square|thumb|small|medium|large|original)\.(?=[^/]*$)")
+
+
+def example_from_observation(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Turn a raw /observations result into an exampleObservation dict
+    (obsId, photoUrl, observer, licenseCode, obsUrl), or None if it has no
+    usable photo. Photos with an allowed license are preferred.
+    """
     photos = raw.get("photos") or []
     if not photos:
         return None
@@ -387,8 +924,8 @@ def fetch_example_observation_for_species(taxon_id: int) -> Optional[Dict[str, A
     url = photo.get("url")
     if not url:
         return None
-    # Use "large" version
-    photo_url = url.replace("square.", "large.")
+    # Use "large" version, whichever size the API handed back
+    photo_url = _PHOTO_SIZE_RE.sub("/large.", url, count=1)
 
     observer = (raw.get("user") or {}).get("login") or "unknown"
     license_code = photo.get("license_code") or raw.get("license_code")
@@ -406,11 +943,164 @@ def fetch_example_observation_for_species(taxon_id: int) -> Optional[Dict[str, A
 # Vocab builder (species-level)
 # -------------------------------------------------------------------
 
-def build_group_vocab_multi_taxa_species(label: str, taxon_ids: List[int], top_n: int):
+def higher_taxonomy(ancestors: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+    """
+    Pick the family, order and class (Latin + Swedish name) out of a taxon's
+    ancestors, as the vocab fields familyScientificName ... classSwedishName.
+    """
+    family_scientific_name: Optional[str] = None
+    family_swedish_name: Optional[str] = None
+    order_scientific_name: Optional[str] = None
+    order_swedish_name: Optional[str] = None
+    class_scientific_name: Optional[str] = None
+    class_swedish_name: Optional[str] = None
+
+    for anc in ancestors:
+        rank = anc.get("rank")
+        if rank == "family" and family_scientific_name is None:
+            family_scientific_name = anc.get("name")
+            family_swedish_name = anc.get("preferred_common_name")
+        elif rank == "order" and order_scientific_name is None:
+            order_scientific_name = anc.get("name")
+            order_swedish_name = anc.get("preferred_common_name")
+        elif rank == "class" and class_scientific_name is None:
+            class_scientific_name = anc.get("name")
+            class_swedish_name = anc.get("preferred_common_name")
+
+    return {
+        "familyScientificName": family_scientific_name,
+        "familySwedishName": family_swedish_name,
+        "orderScientificName": order_scientific_name,
+        "orderSwedishName": order_swedish_name,
+        "classScientificName": class_scientific_name,
+        "classSwedishName": class_swedish_name,
+    }
+
+
+def needs_taxonomy(taxon: Dict[str, Any]) -> bool:
+    """
+    True if the family cannot be resolved from the ancestors the taxon already
+    carries, i.e. it has to be enriched via fetch_taxon_details.
+    """
+    # Guard only: v1 species_counts taxa carry ancestor_ids but no ancestors
+    # today, so this is always True for them and saves no request.
+    ancestors = taxon.get("ancestors")
+    if not ancestors:
+        return True
+    return higher_taxonomy(ancestors)["familyScientificName"] is None
+
+
+def make_vocab_entry(
+    taxon: Dict[str, Any],
+    enriched: Dict[str, Any],
+    count: int,
+    example_obs: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Build one vocab entry from a species_counts taxon, its enriched taxon
+    (with ancestors), its observation count and its example observation.
+    """
+    sci = taxon["name"]
+    lineage = higher_taxonomy(enriched.get("ancestors") or [])
+    return {
+        "scientificName": sci,
+        "swedishName": taxon.get("preferred_common_name"),
+        "genusName": genus_of(sci),
+        # Backwards-compatible field for existing app.js (Latin family name):
+        "familyName": lineage["familyScientificName"],
+        # Explicit family, order + class fields:
+        **lineage,
+        "rank": enriched.get("rank"),
+        "taxonId": taxon["id"],
+        "obsCount": count,
+        "exampleObservation": example_obs,
+    }
+
+
+def select_top_species_multi_taxa(
+    label: str,
+    taxon_ids: List[int],
+    top_n: int,
+) -> List[Dict[str, Any]]:
     """
     For a given group (e.g. 'insects') defined by one or more higher taxon_ids,
     fetch species_counts for each taxon_id, merge them, deduplicate by species
-    (taxon.id), and return up to top_n species with extra fields:
+    (taxon.id), and return the top_n entries as {"taxon": ..., "count": ...},
+    most observed first.
+
+    No taxonomy enrichment happens here, so that main() can batch the /v1/taxa
+    lookups for all groups in one go.
+    """
+    def fetch_for_taxon(tid: int) -> List[Dict[str, Any]]:
+        log(f"Fetching species for {label} from taxon_id={tid} ...")
+        return fetch_species_counts(
+            taxon_id=tid,
+            place_id=SWEDEN_PLACE_ID,
+            per_page=SPECIES_COUNTS_PER_PAGE,
+            locale="sv",
+            # Each taxon's list is sorted by count, so a species outside its
+            # own taxon's top_n can never make the merged top_n either.
+            limit=top_n,
+        )
+
+    # Deduplicate by species taxonId, keeping the highest count
+    species_count: Dict[int, int] = {}  # taxonId -> count
+    species_taxon: Dict[int, Dict[str, Any]] = {}  # taxonId -> taxon
+
+    # All higher taxa of a group are independent queries: fetch them in parallel,
+    # merging each taxon's results as soon as they arrive.
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as ex:
+        for higher_tid, sc in zip(taxon_ids, ex.map(fetch_for_taxon, taxon_ids)):
+            print(f"  Got {len(sc)} leaf taxa for taxon_id={higher_tid}")
+
+            for item in sc:
+                taxon = item.get("taxon") or {}
+                tid = taxon.get("id")
+                if not tid:
+                    continue
+                count = int(item.get("count") or 0)
+
+                if tid not in species_count or count > species_count[tid]:
+                    species_count[tid] = count
+                    species_taxon[tid] = taxon
+
+    # Only top_n survive, so a bounded heap beats sorting every species.
+    top_ids = heapq.nlargest(top_n, species_count, key=species_count.__getitem__)
+    top_species = [{"taxon": species_taxon[tid], "count": species_count[tid]} for tid in top_ids]
+
+    print(f"  Keeping top {len(top_species)} species for {label}")
+    return top_species
+
+
+def load_existing_examples(path: str) -> Dict[int, Dict[str, Any]]:
+    """
+    Read a previously written vocab file and return taxonId -> exampleObservation
+    for the entries that have one. A missing or unreadable file gives {}.
+    """
+    try:
+        with open(path, "rb") as f:
+            entries = json_loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(entries, list):
+        return {}
+    return {
+        e["taxonId"]: e["exampleObservation"]
+        for e in entries
+        if isinstance(e, dict) and e.get("taxonId") and e.get("exampleObservation")
+    }
+
+
+def build_group_vocab_species(
+    label: str,
+    top_species: List[Dict[str, Any]],
+    tax_details: Dict[int, Dict[str, Any]],
+    existing_examples: Optional[Dict[int, Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Turn the selected top species of a group into vocab entries, using
+    tax_details (taxonId -> taxon with ancestors, from fetch_taxon_details)
+    for the higher taxonomy. Each entry has:
 
         scientificName (species),
         swedishName,
@@ -426,115 +1116,52 @@ def build_group_vocab_multi_taxa_species(label: str, taxon_ids: List[int], top_n
         taxonId,
         obsCount,
         exampleObservation
+
+    existing_examples (taxonId -> exampleObservation, from the group's previous
+    output) are reused as-is, so only new species are looked up.
     """
-    all_species_counts: List[Dict[str, Any]] = []
+    candidates = [
+        e for e in top_species if e["taxon"].get("id") and e["taxon"].get("name")
+    ]
 
-    for tid in taxon_ids:
-        print(f"Fetching species for {label} from taxon_id={tid} ...")
-        sc = fetch_species_counts(
-            taxon_id=tid,
-            place_id=SWEDEN_PLACE_ID,
-            per_page=200,
-            locale="sv",
+    examples_by_id: Dict[int, Optional[Dict[str, Any]]] = {
+        e["taxon"]["id"]: existing_examples[e["taxon"]["id"]]
+        for e in candidates
+        if existing_examples and e["taxon"]["id"] in existing_examples
+    }
+    if examples_by_id:
+        print(f"  Reusing {len(examples_by_id)} example observations from the previous build")
+
+    # Swedish examples for most of the rest come from a few bulk queries.
+    to_fetch = [e["taxon"]["id"] for e in candidates if e["taxon"]["id"] not in examples_by_id]
+    if to_fetch:
+        examples_by_id.update(
+            fetch_example_observations_bulk(to_fetch, {"place_id": SWEDEN_PLACE_ID})
         )
-        print(f"  Got {len(sc)} leaf taxa for taxon_id={tid}")
-        all_species_counts.extend(sc)
-
-    # Deduplicate by species taxonId, keeping the highest count
-    species_map: Dict[int, Dict[str, Any]] = {}  # taxonId -> {"taxon": ..., "count": ...}
-
-    for item in all_species_counts:
-        taxon = item.get("taxon") or {}
-        tid = taxon.get("id")
-        if not tid:
-            continue
-        count = int(item.get("count") or 0)
-
-        existing = species_map.get(tid)
-        if existing is None or count > existing.get("count", 0):
-            species_map[tid] = {
-                "taxon": taxon,
-                "count": count,
-            }
-
-    species_list = list(species_map.values())
-    species_list.sort(key=lambda x: x["count"], reverse=True)
-    top_species = species_list[:top_n]
 
-    print(f"  Keeping top {len(top_species)} species for {label}")
+    def fetch_example(entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        taxon = entry["taxon"]
+        if taxon["id"] in examples_by_id:
+            return examples_by_id[taxon["id"]]
+        # Not in the bulk results: per-species lookup (Sweden, then worldwide).
+        log(f"  Fetching example observation for {taxon['name']} (taxon_id={taxon['id']})...")
+        return fetch_example_observation_for_species(taxon["id"])
 
-    # Enrich with full taxonomy (ancestors incl. class/order/family) using /v1/taxa
-    taxon_ids_list = [
-        e["taxon"]["id"] for e in top_species if e["taxon"].get("id") is not None
-    ]
-    tax_details = fetch_taxon_details(taxon_ids_list)
+    # Remaining lookups are independent: run them in parallel, keep the order.
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as ex:
+        examples = list(ex.map(fetch_example, candidates))
 
     vocab: List[Dict[str, Any]] = []
 
-    for entry in top_species:
+    for entry, example_obs in zip(candidates, examples):
         taxon = entry["taxon"]
-        tid = taxon.get("id")
-        if not tid:
-            continue
-
-        sci = taxon.get("name")
-        if not sci:
-            continue
-
-        sw = taxon.get("preferred_common_name")
-        genus_name = sci.split(" ")[0]
-
-        # Use enriched taxon if available (for ancestors)
-        enriched = tax_details.get(tid, taxon)
-        ancestors = enriched.get("ancestors") or []
-
-        family_scientific_name: Optional[str] = None
-        family_swedish_name: Optional[str] = None
-        order_scientific_name: Optional[str] = None
-        order_swedish_name: Optional[str] = None
-        class_scientific_name: Optional[str] = None
-        class_swedish_name: Optional[str] = None
-
-        for anc in ancestors:
-            rank = anc.get("rank")
-            if rank == "family" and family_scientific_name is None:
-                family_scientific_name = anc.get("name")
-                family_swedish_name = anc.get("preferred_common_name")
-            elif rank == "order" and order_scientific_name is None:
-                order_scientific_name = anc.get("name")
-                order_swedish_name = anc.get("preferred_common_name")
-            elif rank == "class" and class_scientific_name is None:
-                class_scientific_name = anc.get("name")
-                class_swedish_name = anc.get("preferred_common_name")
-
-        print(f"  Fetching example observation for {sci} (taxon_id={tid})...")
-        example_obs = fetch_example_observation_for_species(tid)
-
         if example_obs is None:
-            print(f"    -> No usable observation found for {sci}, skipping this species.")
+            print(f"    -> No usable observation found for {taxon['name']}, skipping this species.")
             continue
 
-        vocab.append(
-            {
-                "scientificName": sci,
-                "swedishName": sw,
-                "genusName": genus_name,
-                # Backwards-compatible field for existing app.js (Latin family name):
-                "familyName": family_scientific_name,
-                # New explicit family fields:
-                "familyScientificName": family_scientific_name,
-                "familySwedishName": family_swedish_name,
-                # New order + class fields:
-                "orderScientificName": order_scientific_name,
-                "orderSwedishName": order_swedish_name,
-                "classScientificName": class_scientific_name,
-                "classSwedishName": class_swedish_name,
-                "rank": enriched.get("rank"),
-                "taxonId": tid,
-                "obsCount": entry["count"],
-                "exampleObservation": example_obs,
-            }
-        )
+        # Use enriched taxon if available (for ancestors)
+        enriched = tax_details.get(taxon["id"], taxon)
+        vocab.append(make_vocab_entry(taxon, enriched, entry["count"], example_obs))
 
     print(f"  Built vocab with {len(vocab)} species for {label}")
     return vocab
@@ -554,6 +1181,16 @@ def parse_args():
       default="basic",
       help="Which vocab set to build (controls top_n and output folder).",
   )
+  parser.add_argument(
+      "--no-cache",
+      action="store_true",
+      help="Ignore the on-disk HTTP and taxonomy caches, so all iNat data is fetched fresh.",
+  )
+  parser.add_argument(
+      "--force",
+      action="store_true",
+      help="Look up every example observation again instead of reusing those in existing vocab files.",
+  )
   return parser.parse_args()
 
 
@@ -565,8 +1202,23 @@ def main() -> None:
     output_dir = os.path.join(BASE_OUTPUT_DIR, mode)
     ensure_output_dir(output_dir)
 
+    if args.no_cache:
+        session = get_session()
+        if hasattr(session, "cache"):
+            print(f"Clearing HTTP cache '{HTTP_CACHE_NAME}'")
+            session.cache.clear()
+    else:
+        load_taxon_cache()
+
     print(f"Building vocab in mode='{mode}', output_dir='{output_dir}'")
 
+    out_paths = {
+        cfg["label"]: os.path.join(output_dir, f"{cfg['label']}_vocab_sweden.json")
+        for cfg in taxa_config
+    }
+
+    # Phase 1: pick the top species of every group (species_counts only).
+    top_species_by_label: Dict[str, List[Dict[str, Any]]] = {}
     for cfg in taxa_config:
         label = cfg["label"]
         taxon_ids = cfg["taxon_ids"]
@@ -574,16 +1226,46 @@ def main() -> None:
 
         print(f"\n=== Fetching top {top_n} species for group '{label}' ===")
 
-        vocab = build_group_vocab_multi_taxa_species(
+        top_species_by_label[label] = select_top_species_multi_taxa(
             label=label,
             taxon_ids=taxon_ids,
             top_n=top_n,
         )
 
-        out_path = os.path.join(output_dir, f"{label}_vocab_sweden.json")
-        write_json(vocab, out_path)
+    # Phase 2: enrich the union of all groups' species with full taxonomy
+    # (ancestors incl. class/order/family) in one deduplicated /v1/taxa pass.
+    all_taxa = [
+        e["taxon"] for top_species in top_species_by_label.values() for e in top_species
+    ]
+    print(f"\n=== Enriching taxonomy for {len(all_taxa)} species across all groups ===")
+    tax_details = resolve_taxonomy(all_taxa)
+    save_taxon_cache()
+
+    # Phase 3: build each group's vocab (example observations).
+    vocab_by_label: Dict[str, List[Dict[str, Any]]] = {}
+    for label, top_species in top_species_by_label.items():
+        print(f"\n=== Building vocab for group '{label}' ===")
+
+        existing_examples = None
+        if not (args.force or args.no_cache):
+            existing_examples = load_existing_examples(out_paths[label])
+
+        vocab_by_label[label] = build_group_vocab_species(
+            label=label,
+            top_species=top_species,
+            tax_details=tax_details,
+            existing_examples=existing_examples,
+        )
+
+    # Phase 4: all HTTP work is done; write the group files in parallel.
+    def write_group(label: str) -> None:
+        write_json(vocab_by_label[label], out_paths[label])
+
+    with ThreadPoolExecutor(max_workers=len(vocab_by_label) or 1) as ex:
+        list(ex.map(write_group, vocab_by_label))
 
-        print(f"  -> wrote {len(vocab)} entries to {out_path}")
+    for label, vocab in vocab_by_label.items():
+        print(f"  -> wrote {len(vocab)} entries to {out_paths[label]}")
 
     print(f"\nDone. Mode='{mode}'. Commit the JSON files in '{output_dir}' to your repo.")
 